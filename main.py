@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Request, Query, Body, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
@@ -9,40 +9,34 @@ import os
 import pandas as pd
 import yfinance as yf
 import numpy as np
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
 import warnings
 from dotenv import load_dotenv
 import io
-from contextlib import redirect_stdout, asynccontextmanager
+from contextlib import redirect_stdout, asynccontextmanager, contextmanager
 import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from fastapi_mcp import FastApiMCP
 import traceback
 import httpx
-import uuid
 import time
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+import anyio
+import gzip
+import shutil
+import stat
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.dates import DateFormatter
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.offline as pyo
-from plotly.subplots import make_subplots
-
-# Import chart generation functions
-from scripts.chart_generator import (
-    generate_cumulative_returns_chart,
-    generate_plotly_cumulative_returns_chart,
-    generate_cagr_bar_chart,
-    generate_compound_performance_chart
-)
+matplotlib.use('Agg')  # Use non-interactive backend before the report modules import pyplot
 
 # Import report generation functions
 from scripts.report_generator import (
@@ -69,10 +63,19 @@ IS_LOCAL_DEVELOPMENT = IS_LOCAL_DEVELOPMENT_RAW.lower() in ['1', 'true', 'yes',
 BASE_URL_FOR_REPORTS = os.getenv('BASE_URL_FOR_REPORTS')
 
 # Configure logging (must be before any logger usage)
+# Records go through a queue so stream writes happen on the listener thread, not the event loop
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+log_listener = QueueListener(_log_queue, _log_stream_handler)
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Final format is applied by the listener
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s'
+    handlers=[_log_queue_handler]
 )
+log_listener.start()
+atexit.register(log_listener.stop)  # Paired with start for the process lifetime; flushes queued records on exit
 logger = logging.getLogger(__name__)
 
 # If no .env file exists, default to local development for localhost
@@ -84,52 +87,82 @@ if not IS_LOCAL_DEVELOPMENT and not BASE_URL_FOR_REPORTS:
 RATE_LIMIT = os.getenv("RATE_LIMIT", "30/minute")
 MAX_CONCURRENT_PER_IP = int(os.getenv("MAX_CONCURRENT_PER_IP", "3"))
 MAX_CONCURRENT_GLOBAL = int(os.getenv("MAX_CONCURRENT_GLOBAL", "6"))
+REDIS_URL = os.getenv("REDIS_URL")
 
 
-def get_client_ip(request: Request) -> str:
-    for header in ("x-original-client-ip", "cf-connecting-ip", "x-forwarded-for", "x-real-ip"):
-        val = request.headers.get(header)
-        if val:
-            return val.split(",")[0].strip()
-    return request.client.host if request.client else "unknown"
+# Proxy headers checked in priority order, as the lowercase bytes ASGI servers deliver
+_CLIENT_IP_HEADERS = (b"x-original-client-ip", b"cf-connecting-ip", b"x-forwarded-for", b"x-real-ip")
 
 
-# Rate limiter setup
-limiter = Limiter(key_func=get_client_ip)
-_concurrency_lock = asyncio.Lock()
+def get_client_ip(request: Request) -> str:
+    # Resolved once per request; the logging middleware, limiter and endpoints all ask for it
+    cached = getattr(request.state, "client_ip", None)
+    if cached:
+        return cached
+    client_ip = request.client.host if request.client else "unknown"
+    raw_headers = request.headers.raw
+    for header in _CLIENT_IP_HEADERS:
+        val = next((value for name, value in raw_headers if name == header), None)
+        if val:
+            client_ip = val.decode("latin-1").split(",", 1)[0].strip()
+            break
+    request.state.client_ip = client_ip
+    return client_ip
+
+
+# Rate limiter setup - Redis storage shares counters across workers, memory otherwise
+limiter = Limiter(
+    key_func=get_client_ip,
+    storage_uri=REDIS_URL or "memory://",
+    strategy="moving-window",
+    in_memory_fallback_enabled=bool(REDIS_URL)
+)
 _ip_concurrency: dict[str, int] = {}
 _global_concurrency = 0
 
 
-async def check_concurrency(client_ip: str):
-    """Check and increment concurrency counters. Raises HTTPException if limits exceeded."""
+def check_concurrency(client_ip: str):
+    """Check and increment concurrency counters. Raises HTTPException if limits exceeded.
+
+    Never awaits, so the check-and-increment is atomic on the event loop without a lock.
+    """
     global _global_concurrency
-    async with _concurrency_lock:
-        if _global_concurrency >= MAX_CONCURRENT_GLOBAL:
-            raise HTTPException(status_code=503, detail="Server busy. Please try again shortly.")
-        ip_count = _ip_concurrency.get(client_ip, 0)
-        if ip_count >= MAX_CONCURRENT_PER_IP:
-            raise HTTPException(status_code=429, detail="Too many concurrent requests. Please wait.")
-        _global_concurrency += 1
-        _ip_concurrency[client_ip] = ip_count + 1
-
-
-async def release_concurrency(client_ip: str):
-    """Decrement concurrency counters."""
+    if _global_concurrency >= MAX_CONCURRENT_GLOBAL:
+        raise HTTPException(status_code=503, detail="Server busy. Please try again shortly.")
+    ip_count = _ip_concurrency.get(client_ip, 0)
+    if ip_count >= MAX_CONCURRENT_PER_IP:
+        raise HTTPException(status_code=429, detail="Too many concurrent requests. Please wait.")
+    _global_concurrency += 1
+    _ip_concurrency[client_ip] = ip_count + 1
+
+
+def release_concurrency(client_ip: str):
+    """Decrement concurrency counters. Entries are dropped at zero, so the per-IP dict only holds in-flight clients."""
     global _global_concurrency
-    async with _concurrency_lock:
-        _global_concurrency = max(0, _global_concurrency - 1)
-        ip_count = _ip_concurrency.get(client_ip, 1)
-        if ip_count <= 1:
-            _ip_concurrency.pop(client_ip, None)
-        else:
-            _ip_concurrency[client_ip] = ip_count - 1
+    _global_concurrency = max(0, _global_concurrency - 1)
+    ip_count = _ip_concurrency.get(client_ip, 1)
+    if ip_count <= 1:
+        _ip_concurrency.pop(client_ip, None)
+    else:
+        _ip_concurrency[client_ip] = ip_count - 1
+
+
+@contextmanager
+def admission(client_ip: str):
+    """Hold one concurrency slot for client_ip for the duration of the block."""
+    check_concurrency(client_ip)
+    try:
+        yield
+    finally:
+        release_concurrency(client_ip)
+
 
 # Debug: Log environment variable values
 logger.info(f"Environment Variables:")
 logger.info(f"IS_LOCAL_DEVELOPMENT (raw): '{IS_LOCAL_DEVELOPMENT_RAW}'")
 logger.info(f"IS_LOCAL_DEVELOPMENT (processed): {IS_LOCAL_DEVELOPMENT}")
 logger.info(f"BASE_URL_FOR_REPORTS: '{BASE_URL_FOR_REPORTS}'")
+logger.info(f"Rate limit storage: {'redis' if REDIS_URL else 'memory'}")
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -144,10 +177,12 @@ os.makedirs(REPORTS_DIR, exist_ok=True)
 # Configure the report generator module with environment settings
 set_environment_config(IS_LOCAL_DEVELOPMENT, BASE_URL_FOR_REPORTS, REPORTS_DIR)
 
-# Simple file cleanup function for startup
+# Simple file cleanup function, run periodically in the background
 def cleanup_old_reports(max_age_hours: int = 72) -> dict:
     """
-    Clean up old report files from the reports directory on server startup.
+    Clean up old report files from the reports directory.
+    
+    Runs in a worker thread on startup and then periodically via periodic_report_cleanup.
     
     Args:
         max_age_hours: Maximum age of files in hours before deletion (default: 72 hours = 3 days)
@@ -156,7 +191,7 @@ def cleanup_old_reports(max_age_hours: int = 72) -> dict:
         Dictionary with cleanup statistics
     """
     try:
-        logger.info(f"Starting file cleanup (max age: {max_age_hours} hours)")
+        logger.info("Starting file cleanup (max age: %s hours)", max_age_hours)
         stats = {
             "total_removed": 0,
             "html_removed": 0,
@@ -165,54 +200,59 @@ def cleanup_old_reports(max_age_hours: int = 72) -> dict:
             "errors": 0
         }
         
-        # Calculate cutoff time
-        now = datetime.now()
-        cutoff_time = now - timedelta(hours=max_age_hours)
-        logger.info(f"Cutoff time for file cleanup: {cutoff_time}")
+        # Calculate cutoff time as an epoch timestamp to compare directly with st_mtime
+        cutoff_ts = time.time() - max_age_hours * 3600
+        logger.info("Cutoff time for file cleanup: %s", datetime.fromtimestamp(cutoff_ts))
         
         # Check if reports directory exists
         if not os.path.exists(REPORTS_DIR):
-            logger.info(f"Reports directory does not exist: {REPORTS_DIR}")
+            logger.info("Reports directory does not exist: %s", REPORTS_DIR)
             return stats
         
-        # Process all files in the reports directory
-        for filename in os.listdir(REPORTS_DIR):
-            file_path = os.path.join(REPORTS_DIR, filename)
-            
-            # Skip directories, only process files
-            if os.path.isdir(file_path):
-                continue
-            
-            try:
-                # Get file modification time
-                file_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+        # Process all files in the reports directory; scandir caches type and stat per entry
+        with os.scandir(REPORTS_DIR) as entries:
+            for entry in entries:
+                filename = entry.name
                 
-                # Check if file is older than cutoff
-                if file_time < cutoff_time:
-                    # Determine file type and update stats
-                    if filename.endswith('.html'):
-                        stats["html_removed"] += 1
-                    elif filename.endswith('.csv'):
-                        stats["csv_removed"] += 1
-                    elif filename.endswith('.png'):
-                        stats["png_removed"] += 1
-                    
-                    # Remove the file
-                    os.remove(file_path)
-                    logger.info(f"Removed old file: {filename}")
-                    stats["total_removed"] += 1
+                try:
+                    # Skip directories, only process files
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
                     
-            except Exception as e:
-                logger.error(f"Error processing file {filename}: {str(e)}")
-                stats["errors"] += 1
+                    # Check if file is older than cutoff
+                    if entry.stat(follow_symlinks=False).st_mtime < cutoff_ts:
+                        # Determine file type and update stats
+                        if filename.endswith('.html'):
+                            stats["html_removed"] += 1
+                        elif filename.endswith('.csv'):
+                            stats["csv_removed"] += 1
+                        elif filename.endswith('.png'):
+                            stats["png_removed"] += 1
+                        
+                        # Remove the file
+                        os.remove(entry.path)
+                        logger.info("Removed old file: %s", filename)
+                        stats["total_removed"] += 1
+                        
+                except Exception as e:
+                    logger.error("Error processing file %s: %s", filename, e)
+                    stats["errors"] += 1
         
-        logger.info(f"File cleanup complete. Stats: {stats}")
+        logger.info("File cleanup complete. Stats: %s", stats)
         return stats
         
     except Exception as e:
-        logger.error(f"Error during file cleanup: {str(e)}")
+        logger.error("Error during file cleanup: %s", e)
         return {"error": str(e), "total_removed": 0}
 
+
+async def periodic_report_cleanup(max_age_hours: int = 72, interval_seconds: int = 900):
+    """Run cleanup_old_reports off the event loop on startup and then every interval_seconds."""
+    while True:
+        cleanup_stats = await asyncio.to_thread(cleanup_old_reports, max_age_hours=max_age_hours)
+        logger.info("Periodic cleanup completed: %s", cleanup_stats)
+        await asyncio.sleep(interval_seconds)
+
 # Define lifespan context manager for startup/shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -222,10 +262,14 @@ async def lifespan(app: FastAPI):
     logger.info("MCP endpoint is available at: /mcp")
     logger.info("Using custom httpx client with 3-minute (180 second) timeout")
     
-    # Run file cleanup on startup (keep files from last 3 days)
-    logger.info("Running startup file cleanup...")
-    cleanup_stats = cleanup_old_reports(max_age_hours=72)  # 3 days
-    logger.info(f"Startup cleanup completed: {cleanup_stats}")
+    # Size the default thread pool to the admission limit; analyses run there via asyncio.to_thread
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=MAX_CONCURRENT_GLOBAL, thread_name_prefix="spr-worker")
+    )
+    
+    # Run file cleanup in the background every 15 minutes (keep files from last 3 days)
+    logger.info("Starting background file cleanup task...")
+    cleanup_task = asyncio.create_task(periodic_report_cleanup(max_age_hours=72, interval_seconds=900))
     
     # Log all available routes and their operation IDs
     logger.info("Available routes and operation IDs in FastAPI app:")
@@ -238,23 +282,33 @@ async def lifespan(app: FastAPI):
     yield  # This is where the FastAPI app runs
     
     # Shutdown code
+    cleanup_task.cancel()
+    await asyncio.gather(cleanup_task, return_exceptions=True)
     logger.info("=" * 40)
     logger.info("FastAPI server is shutting down")
     logger.info("=" * 40)
 
 # Create a middleware for request logging
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
+    async def __call__(self, scope, receive, send):
+        # Static assets skip request logging and BaseHTTPMiddleware's per-request wrapping
+        if scope["type"] == "http" and scope["path"].startswith("/static/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
     async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
+        # Short random hex id; unique enough to correlate log lines across workers
+        request_id = os.urandom(8).hex()
         request.state.request_id = request_id
         
         # Log the request
         client_host = get_client_ip(request)
-        logger.info(f"Request [{request_id}]: {request.method} {request.url.path} from {client_host}")
+        logger.info("Request [%s]: %s %s from %s", request_id, request.method, request.url.path, client_host)
         
-        # Try to log query parameters if any
-        if request.query_params:
-            logger.info(f"Request [{request_id}] params: {dict(request.query_params)}")
+        # Log query parameters only when debugging
+        if logger.isEnabledFor(logging.DEBUG) and request.query_params:
+            logger.debug("Request [%s] params: %s", request_id, dict(request.query_params))
         
         start_time = time.time()
         try:
@@ -262,11 +316,11 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             process_time = time.time() - start_time
             
             # Log the response
-            logger.info(f"Response [{request_id}]: {response.status_code} (took {process_time:.4f}s)")
+            logger.info("Response [%s]: %s (took %.4fs)", request_id, response.status_code, process_time)
             return response
         except Exception as e:
             process_time = time.time() - start_time
-            logger.error(f"Request [{request_id}] failed after {process_time:.4f}s: {str(e)}")
+            logger.error("Request [%s] failed after %.4fs: %s", request_id, process_time, e)
             logger.error(traceback.format_exc())
             raise
 
@@ -275,12 +329,13 @@ app = FastAPI(
     title="Security Performance Review (SPR) API",
     description="API for generating SPR portfolio analysis reports using custom calculations and FFN metrics",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
 # Attach rate limiter to app state
 app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, lambda request, exc: JSONResponse(
+app.add_exception_handler(RateLimitExceeded, lambda request, exc: ORJSONResponse(
     status_code=429,
     content={"detail": "Rate limit exceeded. Please try again later."}
 ))
@@ -289,8 +344,8 @@ app.add_middleware(SlowAPIMiddleware)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled error on {request.url.path}: {exc}", exc_info=True)
-    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
+    logger.error("Unhandled error on %s: %s", request.url.path, exc, exc_info=True)
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
 
 # Configure CORS - wildcard origins, no credentials
 app.add_middleware(
@@ -317,10 +372,88 @@ import logging
 uvicorn_logger = logging.getLogger("uvicorn.access")
 uvicorn_logger.disabled = False
 
+# Text assets that get a precompressed .gz copy; report HTML is mostly inline Plotly JSON
+_GZIP_SUFFIXES = (".html", ".csv", ".css", ".js", ".json", ".svg", ".txt")
+_GZIP_MIN_SIZE = 1000
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with browser caching and precompressed gzip copies of text assets.
+
+    Each .gz copy is written once in a worker thread (again only if the source is newer)
+    and served with Content-Encoding: gzip, so repeat fetches cost no compression CPU and
+    get their own ETag from the .gz file.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Directories where writing a gzip copy failed; served uncompressed until restart
+        self._gzip_failed_dirs: set[str] = set()
+
+    def file_response(self, full_path, *args, **kwargs):
+        response = super().file_response(full_path, *args, **kwargs)
+        response.headers.setdefault("Cache-Control", "public, max-age=3600")
+        if full_path.endswith(_GZIP_SUFFIXES) or full_path.endswith(".gz"):
+            response.headers.setdefault("Vary", "Accept-Encoding")
+        return response
+
+    async def get_response(self, path: str, scope) -> Response:
+        # Generated .gz copies and their temp files are only served via Content-Encoding negotiation
+        if path.endswith((".gz", ".tmp")):
+            raise HTTPException(status_code=404)
+        if (
+            scope["method"] in ("GET", "HEAD")
+            and path.endswith(_GZIP_SUFFIXES)
+            and "gzip" in Headers(scope=scope).get("accept-encoding", "")
+        ):
+            gzip_copy = await anyio.to_thread.run_sync(self.gzip_copy, path)
+            if gzip_copy is not None:
+                gz_path, gz_stat = gzip_copy
+                # .gz suffix keeps the original media type (mimetypes reports gzip as the encoding)
+                response = self.file_response(gz_path, gz_stat, scope)
+                if response.status_code == 200:
+                    response.headers["Content-Encoding"] = "gzip"
+                return response
+        return await super().get_response(path, scope)
+
+    def gzip_copy(self, path: str):
+        """Return (gz_path, stat) of an up-to-date gzip copy of path, or None to serve it uncompressed."""
+        try:
+            full_path, stat_result = self.lookup_path(path)
+        except OSError:
+            return None  # Let the uncompressed path report it
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode) or stat_result.st_size < _GZIP_MIN_SIZE:
+            return None
+        gz_dir = os.path.dirname(full_path)
+        if gz_dir in self._gzip_failed_dirs:
+            return None
+        gz_path = full_path + ".gz"
+        try:
+            gz_stat = os.stat(gz_path)
+            if gz_stat.st_mtime >= stat_result.st_mtime:
+                return gz_path, gz_stat
+        except OSError:
+            pass
+        # Write to a private temp file and rename, so concurrent requests never see a partial copy
+        tmp_path = f"{gz_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(full_path, "rb") as src, gzip.open(tmp_path, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, gz_path)
+            return gz_path, os.stat(gz_path)
+        except OSError as e:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            self._gzip_failed_dirs.add(gz_dir)
+            logger.warning("Serving files in %s uncompressed, gzip copy of %s failed: %s", gz_dir, path, e)
+            return None
+
 # Mount static files
 static_dir = os.path.join(os.getcwd(), "static")
 os.makedirs(static_dir, exist_ok=True)
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
 
 # Setup templates
 templates = Jinja2Templates(directory="templates")
@@ -374,6 +507,26 @@ class PortfolioAnalysisResponse(BaseModel):
         description="Success message indicating SPR report generation status"
     )
 
+# yf.download keeps results in module-level dicts that each call clears, so fetches must not overlap
+_fetch_lock = threading.Lock()
+# Report generation renders charts through matplotlib's pyplot state, which is not thread-safe
+_report_lock = threading.Lock()
+
+def run_portfolio_analysis(symbols: str, start_date: str, end_date: str, risk_free_rate: float) -> tuple[str, dict[str, str]]:
+    """Fetch price data and generate the SPR report. Returns (html_url, csv_urls).
+
+    Blocking; endpoints run it in a worker thread so the event loop stays responsive.
+    """
+    with _fetch_lock:
+        data = get_stock_data(symbols, start_date, end_date)
+    with _report_lock:
+        report_result = generate_perf_report(data, risk_free_rate)
+
+    # Older report generator versions return only the HTML URL
+    if isinstance(report_result, tuple):
+        return report_result
+    return report_result, {}
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(
     request: Request,
@@ -394,65 +547,47 @@ async def read_root(
 
 @app.post("/api/analyze")
 @limiter.limit(RATE_LIMIT)
-async def analyze_api(request: Request):
+async def analyze_api(request: Request, analysis_request: PortfolioAnalysisRequest):
     """API endpoint for JavaScript form submission - returns JSON response for SPR analysis using custom calculations and FFN metrics."""
-    client_ip = get_client_ip(request)
-    await check_concurrency(client_ip)
-    try:
-        # Get form data from request
-        form_data = await request.form()
-        symbols = form_data.get("symbols")
-        start_date = form_data.get("start_date")
-        end_date = form_data.get("end_date")
-        risk_free_rate = float(form_data.get("risk_free_rate", 0.0))
-
-        if not all([symbols, start_date, end_date]):
-            return JSONResponse(
-                status_code=400,
-                content={"error": "Missing required fields"}
+    with admission(get_client_ip(request)):
+        try:
+            # Extract parameters from the validated request model
+            symbols = analysis_request.symbols
+            start_date = analysis_request.start_date.isoformat()
+            end_date = analysis_request.end_date.isoformat()
+            risk_free_rate = analysis_request.risk_free_rate
+
+            # Get stock data and generate report
+            html_url, csv_urls = await asyncio.to_thread(
+                run_portfolio_analysis, symbols, start_date, end_date, risk_free_rate
             )
 
-        # Get stock data
-        data = get_stock_data(symbols, start_date, end_date)
-
-        # Generate report (this now returns html_url and csv_urls)
-        report_result = generate_perf_report(data, risk_free_rate)
+            # Return JSON response
+            return ORJSONResponse(
+                content={
+                    "success": True,
+                    "message": "Report generated successfully!",
+                    "html_report_ffn_url": html_url,
+                    "input_price_data_csv_url": csv_urls.get('price_data', ''),
+                    "cumulative_returns_csv_url": csv_urls.get('cumulative_returns', '')
+                }
+            )
 
-        # Extract the URLs from the result
-        if isinstance(report_result, tuple):
-            html_url, csv_urls = report_result
-        else:
-            html_url = report_result
-            csv_urls = {}
-
-        # Return JSON response
-        return JSONResponse(
-            content={
-                "success": True,
-                "message": "Report generated successfully!",
-                "html_report_ffn_url": html_url,
-                "input_price_data_csv_url": csv_urls.get('price_data', ''),
-                "cumulative_returns_csv_url": csv_urls.get('cumulative_returns', '')
-            }
-        )
-
-    except ValueError as e:
-        logger.error(f"Validation error in API: {str(e)}")
-        return JSONResponse(
-            status_code=400,
-            content={"error": "Validation error occurred"}
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Unexpected error in API: {str(e)}")
-        logger.error(traceback.format_exc())
-        return JSONResponse(
-            status_code=500,
-            content={"error": "Analysis failed. Please try again."}
-        )
-    finally:
-        await asyncio.shield(release_concurrency(client_ip))
+        except ValueError as e:
+            logger.error("Validation error in API: %s", e)
+            return ORJSONResponse(
+                status_code=400,
+                content={"error": "Validation error occurred"}
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in API: %s", e)
+            logger.error(traceback.format_exc())
+            return ORJSONResponse(
+                status_code=500,
+                content={"error": "Analysis failed. Please try again."}
+            )
 
 @app.post("/analyze", operation_id="analyze_portfolio", response_model=PortfolioAnalysisResponse)
 @limiter.limit(RATE_LIMIT)
@@ -508,54 +643,53 @@ async def analyze(
 
     Note: SPR analysis may take up to 2-3 minutes depending on date range and number of symbols.
     """
-    client_ip = get_client_ip(request)
-    await check_concurrency(client_ip)
-    try:
-        # Extract parameters from the request model
-        symbols = analysis_request.symbols
-        start_date = analysis_request.start_date.isoformat()
-        end_date = analysis_request.end_date.isoformat()
-        risk_free_rate = analysis_request.risk_free_rate
-
-        logger.info(f"Processing SPR portfolio analysis request for symbols: {symbols}")
-        logger.info(f"Date range: {start_date} to {end_date}")
-        logger.info(f"Risk-free rate: {risk_free_rate}%")
+    with admission(get_client_ip(request)):
+        try:
+            # Extract parameters from the request model
+            symbols = analysis_request.symbols
+            start_date = analysis_request.start_date.isoformat()
+            end_date = analysis_request.end_date.isoformat()
+            risk_free_rate = analysis_request.risk_free_rate
+
+            logger.info("Processing SPR portfolio analysis request for symbols: %s", symbols)
+            logger.info("Date range: %s to %s", start_date, end_date)
+            logger.info("Risk-free rate: %s%%", risk_free_rate)
+
+            # Get stock data and generate report
+            html_url, csv_urls = await asyncio.to_thread(
+                run_portfolio_analysis, symbols, start_date, end_date, risk_free_rate
+            )
 
-        # Get stock data
-        data = get_stock_data(symbols, start_date, end_date)
+            # Return structured response with specific CSV URLs
+            return PortfolioAnalysisResponse(
+                html_report_ffn_url=html_url,
+                input_price_data_csv_url=csv_urls.get('price_data', ''),
+                cumulative_returns_csv_url=csv_urls.get('cumulative_returns', ''),
+                success="SPR (Security Performance Review) portfolio analysis report generated successfully!"
+            )
 
-        # Generate report (this now returns html_url and csv_urls)
-        report_result = generate_perf_report(data, risk_free_rate)
+        except ValueError as e:
+            logger.error("Validation error: %s", e)
+            raise HTTPException(status_code=400, detail="Invalid parameters. Check symbols, dates, and risk-free rate.")
+        except HTTPException:
+            raise  # Re-raise HTTP exceptions as-is
+        except Exception as e:
+            logger.error("Unexpected error: %s", e)
+            logger.error(traceback.format_exc())
+            raise HTTPException(status_code=500, detail="Analysis failed. Please try again.")
 
-        # Extract the URLs from the result
-        if isinstance(report_result, tuple):
-            html_url, csv_urls = report_result
-        else:
-            html_url = report_result
-            csv_urls = {}
-
-        # Return structured response with specific CSV URLs
-        return PortfolioAnalysisResponse(
-            html_report_ffn_url=html_url,
-            input_price_data_csv_url=csv_urls.get('price_data', ''),
-            cumulative_returns_csv_url=csv_urls.get('cumulative_returns', ''),
-            success="SPR (Security Performance Review) portfolio analysis report generated successfully!"
-        )
-
-    except ValueError as e:
-        logger.error(f"Validation error: {str(e)}")
-        raise HTTPException(status_code=400, detail="Invalid parameters. Check symbols, dates, and risk-free rate.")
-    except HTTPException:
-        raise  # Re-raise HTTP exceptions as-is
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        logger.error(traceback.format_exc())
-        raise HTTPException(status_code=500, detail="Analysis failed. Please try again.")
-    finally:
-        await asyncio.shield(release_concurrency(client_ip))
+# Shared HTTP client for MCP tool calls and any other outbound HTTP, lives for the whole process
+# Use localhost to avoid Cloudflare overwriting cf-connecting-ip on external URLs
+mcp_http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(180.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=30),
+    base_url="http://localhost:8000"
+)
+app.state.http_client = mcp_http_client
+# Closed at exit rather than in lifespan, since FastApiMCP holds it across lifespan cycles
+atexit.register(lambda: asyncio.run(mcp_http_client.aclose()))
 
 # Create MCP server AFTER all endpoints are defined with proper configuration
-# Use localhost to avoid Cloudflare overwriting cf-connecting-ip on external URLs
 mcp = FastApiMCP(
     app,
     name="SPR (Security Performance Review) MCP API",
@@ -565,11 +699,7 @@ mcp = FastApiMCP(
     ],
     describe_all_responses=True,
     describe_full_response_schema=True,
-    http_client=httpx.AsyncClient(
-        timeout=180.0,
-        limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-        base_url="http://localhost:8000"
-    )
+    http_client=mcp_http_client
 )
 
 # Mount the MCP server to the FastAPI app
@@ -585,4 +715,7 @@ logger.info("=" * 40)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    # Multiple workers need an import string; rate limits are only shared across workers with REDIS_URL,
+    # and concurrency limits apply per worker
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)